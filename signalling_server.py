@@ -1,86 +1,159 @@
-from typing import Dict
+import argparse
+import os
+import secrets
+import threading
+from multiprocessing.managers import BaseManager, DictProxy
+from typing import Dict, MutableMapping, Tuple, cast
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
 
-app = FastAPI(title="Enspurna Signalling Server")
+# Set by ``main`` when several workers are started, so every worker process
+# talks to the same offer/answer dictionaries instead of its own copy.
+STATE_ADDRESS_ENV = "SIG_STATE_ADDRESS"
+STATE_AUTHKEY_ENV = "SIG_STATE_AUTHKEY"
+
+
+class _StateClient(BaseManager):
+    pass
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["GET", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["*"]
-)
 
-_offers: Dict[str, str] = {}
-_answers: Dict[str, str] = {}
+_StateClient.register("offers", proxytype=DictProxy)
+_StateClient.register("answers", proxytype=DictProxy)
 
 
-def _key(prefix: str, room_id: str) -> str:
-    return f"{prefix}:{room_id}"
+def _connect_state() -> Tuple[MutableMapping[str, bytes], MutableMapping[str, bytes]]:
+    address = os.environ.get(STATE_ADDRESS_ENV)
+    if not address:
+        return {}, {}
+    host, _, port = address.rpartition(":")
+    manager = _StateClient(
+        address=(host, int(port)),
+        authkey=bytes.fromhex(os.environ[STATE_AUTHKEY_ENV]),
+    )
+    manager.connect()
+    # The proxy factories are added by register(), so they are looked up by name.
+    offers = cast(MutableMapping[str, bytes], getattr(manager, "offers")())
+    answers = cast(MutableMapping[str, bytes], getattr(manager, "answers")())
+    return offers, answers
+
+
+_offers, _answers = _connect_state()
 
 
 PREFIX = "sig"
 
 
-def _validate_prefix(prefix: str) -> None:
-    if prefix != PREFIX:
-        raise HTTPException(status_code=404, detail="Unknown prefix")
+def _detail(status_code: int, message: str) -> JSONResponse:
+    return JSONResponse({"detail": message}, status_code=status_code)
 
 
-@app.put("/{prefix}/{room_id}/offer", status_code=204)
-async def put_offer(prefix: str, room_id: str, request: Request):
-    _validate_prefix(prefix)
-    body = (await request.body()).decode("utf-8")
+async def put_offer(request: Request) -> Response:
+    body = await request.body()
     if not body:
-        raise HTTPException(status_code=400, detail="Offer body is empty")
-    _offers[_key(prefix, room_id)] = body
-    return PlainTextResponse("")
+        return _detail(400, "Offer body is empty")
+    _offers[request.path_params["room_id"]] = body
+    return Response(status_code=204)
 
 
-@app.get("/{prefix}/{room_id}/offer")
-async def get_offer(prefix: str, room_id: str):
-    _validate_prefix(prefix)
-    key = _key(prefix, room_id)
-    if key not in _offers:
-        raise HTTPException(status_code=404, detail="Offer not found")
-    return PlainTextResponse(_offers[key])
+async def get_offer(request: Request) -> Response:
+    body = _offers.get(request.path_params["room_id"])
+    if body is None:
+        return _detail(404, "Offer not found")
+    return Response(body, media_type="text/plain")
 
 
-@app.put("/{prefix}/{room_id}/answer", status_code=204)
-async def put_answer(prefix: str, room_id: str, request: Request):
-    _validate_prefix(prefix)
-    body = (await request.body()).decode("utf-8")
+async def put_answer(request: Request) -> Response:
+    body = await request.body()
     if not body:
-        raise HTTPException(status_code=400, detail="Answer body is empty")
-    _answers[_key(prefix, room_id)] = body
-    return PlainTextResponse("")
+        return _detail(400, "Answer body is empty")
+    _answers[request.path_params["room_id"]] = body
+    return Response(status_code=204)
 
 
-@app.delete("/{prefix}/{room_id}/answer")
-async def delete_answer(prefix: str, room_id: str):
-    _validate_prefix(prefix)
-    key = _key(prefix, room_id)
-    body = _answers.pop(key, None)
+async def delete_answer(request: Request) -> Response:
+    body = _answers.pop(request.path_params["room_id"], None)
     if body is None:
-        return PlainTextResponse("", status_code=204)
-    return PlainTextResponse(body)
+        return Response(status_code=204)
+    return Response(body, media_type="text/plain")
+
+
+async def healthcheck(request: Request) -> Response:
+    return JSONResponse({"status": "ok"})
+
+
+async def room_health(request: Request) -> Response:
+    return JSONResponse({"status": "ok", "room": request.path_params["room_id"]})
+
+
+# Plain Starlette routes: the prefix is part of the route template, so unknown
+# prefixes never reach a handler and no per-request validation is needed.
+app = Starlette(
+    routes=[
+        Route(f"/{PREFIX}/{{room_id}}/offer", put_offer, methods=["PUT"]),
+        Route(f"/{PREFIX}/{{room_id}}/offer", get_offer, methods=["GET"]),
+        Route(f"/{PREFIX}/{{room_id}}/answer", put_answer, methods=["PUT"]),
+        Route(f"/{PREFIX}/{{room_id}}/answer", delete_answer, methods=["DELETE"]),
+        Route("/health", healthcheck, methods=["GET"]),
+        Route(f"/{PREFIX}/health", healthcheck, methods=["GET"]),
+        Route(f"/{PREFIX}/{{room_id}}/health", room_health, methods=["GET"]),
+    ],
+    middleware=[
+        Middleware(
+            CORSMiddleware,
+            allow_origins=["*"],
+            allow_credentials=True,
+            allow_methods=["GET", "PUT", "DELETE", "OPTIONS"],
+            allow_headers=["*"],
+        ),
+    ],
+)
+
+
+def _serve_state() -> None:
+    """Host the shared dictionaries in this process for the worker processes."""
+    offers: Dict[str, bytes] = {}
+    answers: Dict[str, bytes] = {}
+
+    class _StateServer(BaseManager):
+        pass
+
+    _StateServer.register("offers", callable=lambda: offers, proxytype=DictProxy)
+    _StateServer.register("answers", callable=lambda: answers, proxytype=DictProxy)
+
+    authkey = secrets.token_bytes(32)
+    server = _StateServer(address=("127.0.0.1", 0), authkey=authkey).get_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = cast(Tuple[str, int], server.address)
+    os.environ[STATE_ADDRESS_ENV] = "%s:%d" % (host, port)
+    os.environ[STATE_AUTHKEY_ENV] = authkey.hex()
 
 
-@app.get("/health", tags=["health"])
-async def healthcheck():
-    return {"status": "ok"}
+def main() -> None:
+    import uvicorn
 
+    parser = argparse.ArgumentParser(description="Enspurna signalling server (Starlette).")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", default=8000, type=int)
+    parser.add_argument("--workers", default=os.cpu_count() or 1, type=int)
+    args = parser.parse_args()
 
-@app.get("/{prefix}/health", tags=["health"])
-async def prefix_health(prefix: str):
-    _validate_prefix(prefix)
-    return {"status": "ok"}
+    if args.workers > 1:
+        _serve_state()
+    # "auto" picks uvloop/httptools when they are installed.
+    uvicorn.run(
+        "signalling_server:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop="auto",
+        http="auto",
+    )
 
 
-@app.get("/{prefix}/{room_id}/health", tags=["health"])
-async def room_health(prefix: str, room_id: str):
-    _validate_prefix(prefix)
-    return {"status": "ok", "room": room_id}
+if __name__ == "__main__":
+    main()
@@ -8,31 +8,125 @@ Endpoints:
     PUT/GET   /sig/<room_id>/offer
     PUT/DELETE /sig/<room_id>/answer
 
-Offers and answers are kept in memory with a simple dictionary.
+Offers and answers are kept in memory and expire TTL_SECONDS after they were
+stored. All connections are multiplexed on a single asyncio event loop (uvloop
+is used when it is installed) and the stores are only touched from that loop,
+so they need no locking.
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
+import functools
+import importlib
 import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from http import HTTPStatus
-from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from typing import Dict, Tuple
-from urllib.parse import urlparse
+from types import ModuleType
+from typing import Callable, Dict, Tuple, cast
+
+
+def _optional_module(name: str) -> ModuleType | None:
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+# Optional accelerators. Each one has a standard library fallback: the json
+# module, the stream-based request parser and the default asyncio event loop.
+_orjson = _optional_module('orjson')
+_httptools = _optional_module('httptools')
+_uvloop = _optional_module('uvloop')
 
 PREFIX = "sig"
-TTL_SECONDS = 60 * 60 * 24  # Placeholder if you want to expire entries later
+TTL_SECONDS = 60 * 60 * 24  # Offers and answers are dropped this long after their PUT
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 5.0  # Seconds a connection gets to deliver its next complete request
+DEFAULT_MAX_CONNECTIONS = 1024
+LOG_ENABLED = os.environ.get('SIG_LOG') == '1'
+
+JSON_CONTENT_TYPE = 'application/json; charset=utf-8'
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Credentials': 'true',
+    'Access-Control-Allow-Headers': '*',
+    'Access-Control-Allow-Methods': 'GET, PUT, DELETE, OPTIONS',
+}
+_CORS_BYTES = ''.join(f'{key}: {value}\r\n' for key, value in CORS_HEADERS.items()).encode('latin-1')
+
+Response = Tuple[HTTPStatus, bytes]
+
+
+class ExpiringStore:
+    """Room-keyed responses that expire ``ttl`` seconds after they are set.
+
+    Every entry gets the same ttl, so keeping entries in the order they were
+    last set also keeps them ordered by deadline. Expired entries are popped
+    from the front whenever the store is accessed, so expiry costs O(1) per
+    evicted entry and never a scan, and each key holds exactly one deadline.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self._ttl = ttl
+        self._entries: OrderedDict[str, Tuple[float, Response]] = OrderedDict()
+
+    def _expire(self, now: float) -> None:
+        entries = self._entries
+        while entries:
+            room_id = next(iter(entries))
+            if entries[room_id][0] > now:
+                return
+            del entries[room_id]
+
+    def set(self, room_id: str, response: Response) -> None:
+        now = time.monotonic()
+        self._expire(now)
+        self._entries[room_id] = (now + self._ttl, response)
+        self._entries.move_to_end(room_id)
+
+    def get(self, room_id: str) -> Response | None:
+        self._expire(time.monotonic())
+        entry = self._entries.get(room_id)
+        return None if entry is None else entry[1]
+
+    def pop(self, room_id: str) -> Response | None:
+        self._expire(time.monotonic())
+        entry = self._entries.pop(room_id, None)
+        return None if entry is None else entry[1]
+
+
+# Stored bodies never change, so each entry is the complete 200 response that
+# serves it, rendered once on PUT.
+offers = ExpiringStore(TTL_SECONDS)
+answers = ExpiringStore(TTL_SECONDS)
+
 
-offers: Dict[str, str] = {}
-answers: Dict[str, str] = {}
+def _compact_json_dumps(obj: object) -> bytes:
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+# Compact JSON encoder returning bytes (orjson when installed).
+json_dumps: Callable[[object], bytes] = (
+    _orjson.dumps if _orjson is not None else _compact_json_dumps
+)
 
 
 def _path_segments(raw_path: str) -> list[str]:
-    parsed = urlparse(raw_path)
-    return [segment for segment in parsed.path.split('/') if segment]
+    path = raw_path.partition('?')[0]
+    return [segment for segment in path.split('/') if segment]
 
 
-def parse_path(path: str) -> Tuple[str, str, str]:
+def _parse_path(path: str) -> Tuple[str, str, str]:
     parts = _path_segments(path)
     if len(parts) != 3:
         raise ValueError('Invalid path')
@@ -44,152 +138,537 @@ def parse_path(path: str) -> Tuple[str, str, str]:
     return prefix, room_id, resource
 
 
-def read_body(handler: BaseHTTPRequestHandler) -> str:
-    length = int(handler.headers.get('Content-Length', '0'))
-    return handler.rfile.read(length).decode('utf-8') if length else ''
-
-
-class SignallingHandler(BaseHTTPRequestHandler):
-    CORS_HEADERS = {
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Credentials': 'true',
-        'Access-Control-Allow-Headers': '*',
-        'Access-Control-Allow-Methods': 'GET, PUT, DELETE, OPTIONS',
-    }
-
-    def _set_headers(
-        self,
-        status: int,
-        *,
-        content_type: str = 'text/plain; charset=utf-8',
-        headers: Dict[str, str] | None = None,
-    ) -> None:
-        self.send_response(status)
-        self.send_header('Content-Type', content_type)
-        for key, value in self.CORS_HEADERS.items():
-            self.send_header(key, value)
-        if headers:
-            for key, value in headers.items():
-                self.send_header(key, value)
-        self.end_headers()
-
-    def _write_detail(
-        self,
-        status: HTTPStatus,
-        message: str,
-        *,
-        headers: Dict[str, str] | None = None,
-    ) -> None:
-        self._set_headers(status, content_type='application/json; charset=utf-8', headers=headers)
-        self.wfile.write(json.dumps({'detail': message}).encode('utf-8'))
-
-    def _handle(self, method: str) -> None:
-        try:
-            _, room_id, resource = parse_path(self.path)
-        except ValueError as exc:
-            self._write_detail(HTTPStatus.NOT_FOUND, str(exc))
-            return
+_parse_path_cached = lru_cache(maxsize=4096)(_parse_path)
 
-        key = f"{resource}:{room_id}"
 
-        if resource == 'offer':
-            store = offers
-        else:
-            store = answers
+def parse_path(path: str) -> Tuple[str, str, str]:
+    # The same few room paths are polled over and over; only short paths are
+    # memoised so oversized ids cannot crowd the cache.
+    if len(path) < 128:
+        return _parse_path_cached(path)
+    return _parse_path(path)
 
-        if method == 'PUT':
-            body = read_body(self)
-            if not body:
-                message = 'Offer body is empty' if resource == 'offer' else 'Answer body is empty'
-                self._write_detail(HTTPStatus.BAD_REQUEST, message)
-                return
-            store[key] = body
-            self._set_headers(HTTPStatus.NO_CONTENT)
-            return
 
-        if method == 'GET' and resource == 'offer':
-            value = store.get(key)
-            if value is None:
-                self._write_detail(HTTPStatus.NOT_FOUND, 'Offer not found')
-                return
-            self._set_headers(HTTPStatus.OK)
-            self.wfile.write(value.encode('utf-8'))
-            return
+def parse_head(head: bytes) -> Tuple[str, str, int, bool]:
+    """Parse a raw request head into method, target, body length and keep-alive.
 
-        if method == 'DELETE' and resource == 'answer':
-            value = store.pop(key, None)
-            if value is None:
-                self._set_headers(HTTPStatus.NO_CONTENT)
-                return
-            self._set_headers(HTTPStatus.OK)
-            self.wfile.write(value.encode('utf-8'))
-            return
+    Only ``Content-Length`` and ``Connection`` affect how a request is served,
+    so they are picked out while scanning and every other header is skipped.
+    ``Transfer-Encoding`` is rejected since chunked bodies are not supported.
+    """
+    lines = head.split(b'\r\n')
+    try:
+        method, target, version = lines[0].decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise ValueError('Malformed request line') from None
+    if not target.isascii() or not target.isprintable():
+        raise ValueError('Invalid char in url path')
+    content_length: int | None = None
+    connection = b''
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(b':')
+        if not sep:
+            raise ValueError('Malformed header line')
+        name = name.strip().lower()
+        if name == b'content-length':
+            value = value.strip()
+            if not value.isdigit():
+                raise ValueError('Invalid Content-Length')
+            if content_length is not None and int(value) != content_length:
+                raise ValueError('Conflicting Content-Length')
+            content_length = int(value)
+        elif name == b'connection':
+            connection = value.lower()
+        elif name == b'transfer-encoding':
+            raise ValueError('Transfer-Encoding not supported')
+    # HTTP/1.0 clients are answered and closed, which is their default anyway.
+    keep_alive = version == 'HTTP/1.1' and b'close' not in connection
+    return method, target, content_length or 0, keep_alive
+
+
+async def read_body(reader: asyncio.StreamReader, length: int) -> bytes:
+    return await reader.readexactly(length) if length else b''
+
+
+def build_response(
+    status: HTTPStatus,
+    body: bytes = b'',
+    *,
+    content_type: str = 'text/plain; charset=utf-8',
+    headers: Dict[str, str] | None = None,
+) -> Response:
+    head = f'HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: {content_type}\r\n'
+    if status != HTTPStatus.NO_CONTENT:
+        head += f'Content-Length: {len(body)}\r\n'
+    if headers:
+        head += ''.join(f'{key}: {value}\r\n' for key, value in headers.items())
+    return status, head.encode('latin-1') + _CORS_BYTES + b'\r\n' + body
+
+
+def _closing(frame: bytes) -> bytes:
+    """Add ``Connection: close`` to a prebuilt response frame."""
+    return frame.replace(b'\r\n\r\n', b'\r\nConnection: close\r\n\r\n', 1)
+
+
+def _write_detail(
+    status: HTTPStatus,
+    message: str,
+    *,
+    headers: Dict[str, str] | None = None,
+) -> Response:
+    return build_response(
+        status,
+        json_dumps({'detail': message}),
+        content_type=JSON_CONTENT_TYPE,
+        headers=headers,
+    )
+
+
+# Responses whose payload never changes are rendered once at import time.
+NO_CONTENT = build_response(HTTPStatus.NO_CONTENT)
+HEALTH_OK = build_response(
+    HTTPStatus.OK,
+    json_dumps({'status': 'ok'}),
+    content_type=JSON_CONTENT_TYPE,
+)
+NOT_FOUND = _write_detail(HTTPStatus.NOT_FOUND, 'Not found')
+OFFER_NOT_FOUND = _write_detail(HTTPStatus.NOT_FOUND, 'Offer not found')
+TOO_MANY_CONNECTIONS = _write_detail(HTTPStatus.SERVICE_UNAVAILABLE, 'Too many connections')
+HEADER_TOO_LARGE = _write_detail(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, 'Header too large')
+BODY_TOO_LARGE = _write_detail(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Body too large')
+TRANSFER_ENCODING_REJECTED = _write_detail(HTTPStatus.BAD_REQUEST, 'Transfer-Encoding not supported')
+UPGRADE_REJECTED = _write_detail(HTTPStatus.BAD_REQUEST, 'Upgrade not supported')
+PATH_ERRORS = {
+    message: _write_detail(HTTPStatus.NOT_FOUND, message)
+    for message in ('Invalid path', 'Unknown prefix', 'Unknown resource')
+}
+EMPTY_BODY = {
+    'offer': _write_detail(HTTPStatus.BAD_REQUEST, 'Offer body is empty'),
+    'answer': _write_detail(HTTPStatus.BAD_REQUEST, 'Answer body is empty'),
+}
+METHOD_NOT_ALLOWED = {
+    'offer': _write_detail(
+        HTTPStatus.METHOD_NOT_ALLOWED, 'Method not allowed', headers={'Allow': 'GET, PUT'},
+    ),
+    'answer': _write_detail(
+        HTTPStatus.METHOD_NOT_ALLOWED, 'Method not allowed', headers={'Allow': 'PUT, DELETE'},
+    ),
+}
+
+
+def _room_health_body(room_id: str) -> bytes:
+    # Printable ASCII other than quotes and backslashes is emitted verbatim by
+    # either encoder, so the common case can skip the serializer entirely.
+    if room_id.isascii() and room_id.isprintable() and '"' not in room_id and '\\' not in room_id:
+        return b'{"status":"ok","room":"' + room_id.encode('ascii') + b'"}'
+    return json_dumps({'status': 'ok', 'room': room_id})
+
+
+def _put_offer(room_id: str, body: bytes) -> Response:
+    if not body:
+        return EMPTY_BODY['offer']
+    offers.set(room_id, build_response(HTTPStatus.OK, body))
+    return NO_CONTENT
+
+
+def _get_offer(room_id: str, body: bytes) -> Response:
+    response = offers.get(room_id)
+    if response is None:
+        return OFFER_NOT_FOUND
+    return response
+
+
+def _put_answer(room_id: str, body: bytes) -> Response:
+    if not body:
+        return EMPTY_BODY['answer']
+    answers.set(room_id, build_response(HTTPStatus.OK, body))
+    return NO_CONTENT
+
+
+def _delete_answer(room_id: str, body: bytes) -> Response:
+    response = answers.pop(room_id)
+    if response is None:
+        return NO_CONTENT
+    return response
+
+
+_DISPATCH: Dict[Tuple[str, str], Callable[[str, bytes], Response]] = {
+    ('PUT', 'offer'): _put_offer,
+    ('GET', 'offer'): _get_offer,
+    ('PUT', 'answer'): _put_answer,
+    ('DELETE', 'answer'): _delete_answer,
+}
+
+
+def _handle(method: str, path: str, body: bytes) -> Response:
+    try:
+        _, room_id, resource = parse_path(path)
+    except ValueError as exc:
+        return PATH_ERRORS[str(exc)]
+    handler = _DISPATCH.get((method, resource))
+    if handler is None:
+        return METHOD_NOT_ALLOWED[resource]
+    return handler(room_id, body)
 
-        allow = 'GET, PUT' if resource == 'offer' else 'PUT, DELETE'
-        self._write_detail(
-            HTTPStatus.METHOD_NOT_ALLOWED,
-            'Method not allowed',
-            headers={'Allow': allow},
-        )
 
-    def _health(self) -> None:
+def _health(path: str) -> Response:
+    try:
+        parts = _path_segments(path)
+        if len(parts) == 1 and parts[0] == 'health':
+            return HEALTH_OK
+        if len(parts) == 2 and parts[0] == PREFIX and parts[1] == 'health':
+            return HEALTH_OK
+        if len(parts) == 3 and parts[0] == PREFIX and parts[2] == 'health':
+            return build_response(
+                HTTPStatus.OK,
+                _room_health_body(parts[1]),
+                content_type=JSON_CONTENT_TYPE,
+            )
+    except Exception as exc:  # noqa: B902
+        return _write_detail(HTTPStatus.BAD_REQUEST, str(exc))
+    return NOT_FOUND
+
+
+def dispatch(method: str, path: str, body: bytes) -> Response:
+    if method == 'GET' and path.endswith('/health'):
+        return _health(path)
+    if method in ('GET', 'PUT', 'DELETE'):
+        return _handle(method, path, body)
+    if method == 'OPTIONS':
+        return NO_CONTENT
+    return _write_detail(HTTPStatus.NOT_IMPLEMENTED, f'Unsupported method ({method!r})')
+
+
+_log_queue: queue.SimpleQueue[Tuple[str, str, str, int]] = queue.SimpleQueue()
+_log_writer: threading.Thread | None = None
+
+
+def log_message(client: str, method: str, path: str, status: int) -> None:
+    # Formatting and printing happen on the writer thread, off the event loop.
+    global _log_writer
+    if _log_writer is None:
+        _log_writer = threading.Thread(target=_write_logs, name='signalling-log', daemon=True)
+        _log_writer.start()
+    _log_queue.put((client, method, path, status))
+
+
+def _write_logs() -> None:
+    global LOG_ENABLED
+    while True:
+        entries = [_log_queue.get()]
+        # Drain whatever piled up meanwhile so a burst costs a single write.
+        while True:
+            try:
+                entries.append(_log_queue.get_nowait())
+            except queue.Empty:
+                break
         try:
-            parts = _path_segments(self.path)
-            if len(parts) == 1 and parts[0] == 'health':
-                self._set_headers(HTTPStatus.OK, content_type='application/json; charset=utf-8')
-                self.wfile.write(json.dumps({'status': 'ok'}).encode('utf-8'))
-                return
-            if len(parts) == 2 and parts[0] == PREFIX and parts[1] == 'health':
-                self._set_headers(HTTPStatus.OK, content_type='application/json; charset=utf-8')
-                self.wfile.write(json.dumps({'status': 'ok'}).encode('utf-8'))
-                return
-            if len(parts) == 3 and parts[0] == PREFIX and parts[2] == 'health':
-                self._set_headers(HTTPStatus.OK, content_type='application/json; charset=utf-8')
-                self.wfile.write(json.dumps({'status': 'ok', 'room': parts[1]}).encode('utf-8'))
-                return
-        except Exception as exc:  # noqa: B902
-            self._write_detail(HTTPStatus.BAD_REQUEST, str(exc))
+            sys.stdout.write(''.join(
+                json_dumps({
+                    'client': client,
+                    'method': method,
+                    'path': path,
+                    'message': f'"{method} {path}" {status}',
+                }).decode('utf-8') + '\n'
+                for client, method, path, status in entries
+            ))
+            sys.stdout.flush()
+        except (OSError, ValueError):
+            # stdout is gone (e.g. a closed pipe): stop queueing entries that
+            # nothing would ever write.
+            LOG_ENABLED = False
             return
-        self._write_detail(HTTPStatus.NOT_FOUND, 'Not found')
 
-    def do_PUT(self) -> None:  # noqa: N802 (base class API)
-        self._handle('PUT')
 
-    def do_GET(self) -> None:  # noqa: N802
-        if self.path.endswith('/health'):
-            self._health()
-        else:
-            self._handle('GET')
+class ConnectionLimit:
+    """Counts open connections so a burst beyond the cap is turned away early."""
+
+    def __init__(self, maximum: int) -> None:
+        self.maximum = maximum
+        self.active = 0
+
+    def acquire(self) -> bool:
+        if self.active >= self.maximum:
+            return False
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
 
-    def do_DELETE(self) -> None:  # noqa: N802
-        self._handle('DELETE')
 
-    def do_OPTIONS(self) -> None:  # noqa: N802
-        self._set_headers(HTTPStatus.NO_CONTENT)
+def _close_writer(writer: asyncio.StreamWriter) -> None:
+    writer.close()
+    transport = writer.transport
+    if transport.get_write_buffer_size():
+        # close() waits for the buffer to flush; drop a client that stopped reading.
+        asyncio.get_running_loop().call_later(KEEP_ALIVE_TIMEOUT, transport.abort)
 
-    def log_message(self, format: str, *args) -> None:  # noqa: A003
-        # Reduce noise in console
-        print(json.dumps({
-            'client': self.client_address[0],
-            'method': self.command,
-            'path': self.path,
-            'message': format % args,
-        }))
+
+async def handle(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    limit: ConnectionLimit,
+) -> None:
+    if not limit.acquire():
+        writer.write(_closing(TOO_MANY_CONNECTIONS[1]))
+        _close_writer(writer)
+        return
+    peer = writer.get_extra_info('peername')
+    client = peer[0] if peer else '-'
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            # One deadline covers waiting for the next request, reading all of it
+            # and writing the response. Aborting the transport makes whichever
+            # read or drain is pending fail, even if the client stopped reading.
+            deadline = loop.call_later(KEEP_ALIVE_TIMEOUT, writer.transport.abort)
+            try:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    return  # Client went away (or timed out) between requests.
+                method = path = '-'
+                try:
+                    method, path, length, reuse = parse_head(head)
+                    if length > MAX_BODY_BYTES:
+                        status, response = BODY_TOO_LARGE
+                        reuse = False
+                    else:
+                        body = await read_body(reader, length)
+                        status, response = dispatch(method, path, body)
+                except ValueError as exc:
+                    status, response = _write_detail(HTTPStatus.BAD_REQUEST, str(exc))
+                    reuse = False
+                if LOG_ENABLED:
+                    log_message(client, method, path, status.value)
+                writer.write(response if reuse else _closing(response))
+                await writer.drain()
+            finally:
+                deadline.cancel()
+            if not reuse:
+                return
+    except asyncio.LimitOverrunError:
+        writer.write(_closing(HEADER_TOO_LARGE[1]))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        limit.release()
+        _close_writer(writer)
+
+
+class HttpToolsProtocol(asyncio.Protocol):
+    """Connection handler that parses requests with httptools (llhttp) in C.
+
+    Used instead of :func:`handle` when httptools is installed. Well-formed
+    requests go through the same :func:`dispatch` and get the same responses,
+    and both paths reject Transfer-Encoding, oversized heads and bodies and
+    non-ASCII request targets. llhttp is stricter about malformed input than
+    :func:`parse_head` (it also refuses a repeated Content-Length with the same
+    value, for example), and its 400 responses carry llhttp's own error text.
+    A request asking for a protocol upgrade is answered normally and the
+    connection is then closed, where :func:`handle` keeps it open.
+    """
+
+    def __init__(self, httptools: ModuleType, limit: ConnectionLimit) -> None:
+        self._limit = limit
+        self._admitted = False
+        self._parser = httptools.HttpRequestParser(self)
+        self._parse_errors = httptools.HttpParserError
+        self._upgrade_error = httptools.HttpParserUpgrade
+        self._transport: asyncio.Transport | None = None
+        # Like the stream path, one deadline covers waiting for the next request
+        # and receiving all of it; it is only re-armed once a request completes.
+        # It aborts the transport, so a client that stopped reading is dropped
+        # too, whether or not a close is already waiting for the buffer to flush.
+        self._deadline: asyncio.TimerHandle | None = None
+        self._client = '-'
+        self._url: list[bytes] = []
+        self._body: list[bytes] = []
+        # httptools buffers an unfinished URL or header value internally, so the
+        # head size is tracked from the raw bytes received while it is incomplete.
+        self._in_head = False
+        self._in_body = False
+        self._head_bytes = 0
+        self._header_bytes = 0
+        self._body_bytes = 0
+        # Set by a callback right before it raises to abort parsing.
+        self._error: Response | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = cast(asyncio.Transport, transport)
+        if not self._limit.acquire():
+            self._reject(TOO_MANY_CONNECTIONS)
+            return
+        self._admitted = True
+        peer = transport.get_extra_info('peername')
+        self._client = peer[0] if peer else '-'
+        self._arm_deadline()
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if self._admitted:
+            self._limit.release()
+            self._admitted = False
+        if self._deadline is not None:
+            self._deadline.cancel()
+        self._transport = None
+
+    def pause_writing(self) -> None:
+        if self._transport is not None:
+            self._transport.pause_reading()
+
+    def resume_writing(self) -> None:
+        if self._transport is not None:
+            self._transport.resume_reading()
+
+    def data_received(self, data: bytes) -> None:
+        try:
+            self._parser.feed_data(data)
+        except self._parse_errors as exc:
+            if self._error is not None:
+                self._reject(self._error)
+            else:
+                self._reject(_write_detail(HTTPStatus.BAD_REQUEST, str(exc)))
+            return
+        except self._upgrade_error:
+            if self._in_head or self._in_body:
+                self._reject(UPGRADE_REJECTED)
+            elif self._transport is not None and not self._transport.is_closing():
+                # The request was already answered; the rest of the stream
+                # belongs to a protocol this server does not speak.
+                self._close(self._transport)
+            return
+        if self._in_head:
+            # Counting the whole chunk may include the tail of a pipelined
+            # request before this one, which only errs towards rejecting.
+            self._head_bytes += len(data)
+            if self._head_bytes > MAX_HEADER_BYTES:
+                self._reject(HEADER_TOO_LARGE)
+
+    # httptools parser callbacks
+
+    def on_message_begin(self) -> None:
+        self._url = []
+        self._body = []
+        self._in_head = True
+        self._in_body = False
+        self._head_bytes = 0
+        self._header_bytes = 0
+        self._body_bytes = 0
+
+    def on_url(self, url: bytes) -> None:
+        self._url.append(url)
+        self._count_header_bytes(len(url))
+
+    def on_header(self, name: bytes, value: bytes) -> None:
+        self._count_header_bytes(len(name) + len(value))
+        name = name.lower()
+        if name == b'content-length' and value.strip().isdigit():
+            if int(value) > MAX_BODY_BYTES:
+                self._error = BODY_TOO_LARGE
+                raise ValueError('Body too large')
+        elif name == b'transfer-encoding':
+            self._error = TRANSFER_ENCODING_REJECTED
+            raise ValueError('Transfer-Encoding not supported')
+
+    def _count_header_bytes(self, size: int) -> None:
+        # Catches a head that arrives complete in one oversized chunk, which the
+        # raw count in data_received never sees unfinished.
+        self._header_bytes += size
+        if self._header_bytes > MAX_HEADER_BYTES:
+            self._error = HEADER_TOO_LARGE
+            raise ValueError('Header too large')
+
+    def on_headers_complete(self) -> None:
+        self._in_head = False
+        self._in_body = True
+
+    def on_body(self, body: bytes) -> None:
+        self._body_bytes += len(body)
+        if self._body_bytes > MAX_BODY_BYTES:
+            self._error = BODY_TOO_LARGE
+            raise ValueError('Body too large')
+        self._body.append(body)
+
+    def on_message_complete(self) -> None:
+        self._in_body = False
+        transport = self._transport
+        if transport is None or transport.is_closing():
+            return  # A pipelined request arrived after we decided to close.
+        method = self._parser.get_method().decode('latin-1')
+        path = b''.join(self._url).decode('latin-1')
+        status, response = dispatch(method, path, b''.join(self._body))
+        if LOG_ENABLED:
+            log_message(self._client, method, path, status.value)
+        # HTTP/1.0 clients are answered and closed, as in parse_head.
+        if self._parser.get_http_version() == '1.1' and self._parser.should_keep_alive():
+            transport.write(response)
+            self._arm_deadline()
+        else:
+            transport.write(_closing(response))
+            self._close(transport)
+
+    def _reject(self, response: Response) -> None:
+        transport = self._transport
+        if transport is None or transport.is_closing():
+            return
+        if LOG_ENABLED:
+            log_message(self._client, '-', '-', response[0].value)
+        transport.write(_closing(response[1]))
+        self._close(transport)
+
+    def _close(self, transport: asyncio.Transport) -> None:
+        transport.close()
+        self._arm_deadline()  # Cancelled by connection_lost once the buffer flushes.
+
+    def _arm_deadline(self) -> None:
+        if self._deadline is not None:
+            self._deadline.cancel()
+        transport = self._transport
+        if transport is not None:
+            loop = asyncio.get_running_loop()
+            self._deadline = loop.call_later(KEEP_ALIVE_TIMEOUT, transport.abort)
+
+
+async def serve(host: str, port: int, max_connections: int = DEFAULT_MAX_CONNECTIONS) -> None:
+    # Both asyncio and uvloop set TCP_NODELAY on accepted sockets, so small
+    # responses are never held back by Nagle. SO_REUSEPORT is deliberately not
+    # used: offers/answers live in this process, and a second process sharing
+    # the port would split rooms between two separate stores.
+    limit = ConnectionLimit(max_connections)
+    httptools = _httptools
+    if httptools is not None:
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(lambda: HttpToolsProtocol(httptools, limit), host, port)
+    else:
+        server = await asyncio.start_server(
+            functools.partial(handle, limit=limit), host, port, limit=MAX_HEADER_BYTES,
+        )
+    print(f'Starting signalling server on http://{host}:{port}')
+    async with server:
+        await server.serve_forever()
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description='Simple signalling server (built-in libs only).')
     parser.add_argument('--host', default='0.0.0.0')
     parser.add_argument('--port', default=5174, type=int)
+    parser.add_argument(
+        '--max-connections',
+        default=DEFAULT_MAX_CONNECTIONS,
+        type=int,
+        help='Open connections served at once; extra ones get a 503 and are closed.',
+    )
     args = parser.parse_args()
 
-    server = ThreadingHTTPServer((args.host, args.port), SignallingHandler)
-    print(f'Starting signalling server on http://{args.host}:{args.port}')
+    if _uvloop is not None:
+        _uvloop.install()
     try:
-        server.serve_forever()
+        asyncio.run(serve(args.host, args.port, args.max_connections))
     except KeyboardInterrupt:
         print('\nShutting down signalling server...')
-        server.shutdown()
 
 
 if __name__ == '__main__':